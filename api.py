@@ -6,16 +6,89 @@ Serves categorized and summarized emails to the web interface
 
 import json
 import os
-from flask import Flask, jsonify, request, send_from_directory
+import threading
+from datetime import date, datetime
+from functools import wraps
+
+import orjson
+from flask import Flask, jsonify, make_response, request, send_from_directory
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
 from flask_cors import CORS
 from email_categorizer import EmailCategorizer
 
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider that serializes responses with orjson instead of the stdlib json module"""
+
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    mimetype = 'application/json'
+
+    @staticmethod
+    def default(obj):
+        """Serialize types orjson does not handle natively"""
+        if isinstance(obj, (datetime, date)):
+            return obj.isoformat()
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response to skip a decode/encode round-trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option),
+            mimetype=self.mimetype
+        )
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)  # Enable CORS for all routes
+Compress(app)  # gzip/br compress responses
 
 # Initialize the email categorizer
 categorizer = EmailCategorizer()
 
+# Gmail access and processing state are not thread-safe; run one fetch/process/save at a time
+# per worker (EmailCategorizer.save_processed_data also locks the data files across workers)
+processing_lock = threading.Lock()
+
+def matching_etag(etag):
+    """
+    Return the If-None-Match tag that matches etag, or None
+    
+    Flask-Compress appends :gzip/:br to the 200's ETag, so the suffix is ignored
+    when comparing and the client's own tag is returned for the 304 to echo.
+    """
+    if_none_match = request.if_none_match
+    if if_none_match.star_tag:
+        return etag
+    return next((tag for tag in if_none_match.as_set(include_weak=True)
+                 if tag.split(':', 1)[0] == etag), None)
+
+def etag_cached(view):
+    """Answer with 304 Not Modified while the processed data files are unchanged"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        etag = categorizer.data_etag()
+        matched = matching_etag(etag) if etag else None
+        if matched:
+            # A 304 must carry the same validator the 200 sent, encoding suffix included
+            response = app.response_class(status=304)
+            response.set_etag(matched)
+            return response
+        
+        response = make_response(view(*args, **kwargs))
+        if etag and response.status_code == 200:
+            response.set_etag(etag)
+        return response
+    return wrapper
+
 @app.route('/')
 def index():
     """Serve the main web interface"""
@@ -30,7 +103,8 @@ def static_files(filename):
 def authenticate():
     """Authenticate with Gmail API"""
     try:
-        categorizer.authenticate()
+        with processing_lock:
+            categorizer.authenticate()
         return jsonify({'success': True, 'message': 'Authentication successful'})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -43,11 +117,16 @@ def process_emails():
         query = data.get('query', 'newer_than:7d')
         max_results = data.get('max_results', 30)
         
-        # Process emails
-        processed_data = categorizer.process_emails(query=query, max_results=max_results)
-        
-        # Save processed data
-        categorizer.save_processed_data(processed_data)
+        with processing_lock:
+            # Each gunicorn worker holds its own Gmail session, so authenticate here if this one has none
+            if categorizer.gmail.service is None:
+                categorizer.authenticate()
+            
+            # Process emails
+            processed_data, full_content = categorizer.process_emails(query=query, max_results=max_results)
+            
+            # Save processed data
+            categorizer.save_processed_data(processed_data, full_content=full_content)
         
         return jsonify({
             'success': True,
@@ -58,6 +137,7 @@ def process_emails():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/emails')
+@etag_cached
 def get_emails():
     """Get processed emails data"""
     try:
@@ -79,6 +159,7 @@ def get_emails():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/emails/section/<section>')
+@etag_cached
 def get_emails_by_section(section):
     """Get emails filtered by section"""
     try:
@@ -101,6 +182,7 @@ def get_emails_by_section(section):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/emails/category/<category>')
+@etag_cached
 def get_emails_by_category(category):
     """Get articles filtered by topic category"""
     try:
@@ -109,7 +191,7 @@ def get_emails_by_category(category):
         if category == 'all':
             articles = processed_data.get('sections', {}).get('articles', [])
         else:
-            articles = processed_data.get('article_categories', {}).get(category, [])
+            articles = categorizer.articles_in_category(processed_data, category)
         
         return jsonify({
             'success': True,
@@ -122,18 +204,24 @@ def get_emails_by_category(category):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/email/<email_id>')
+@etag_cached
 def get_email_details(email_id):
     """Get full details of a specific email"""
     try:
         processed_data = categorizer.load_processed_data()
-        newsletters = processed_data.get('newsletters', [])
+        sections = processed_data.get('sections', {})
         
         # Find the email by ID
-        email = next((e for e in newsletters if e['id'] == email_id), None)
+        email = next((e for emails in sections.values() for e in emails if e['id'] == email_id), None)
         
         if not email:
             return jsonify({'success': False, 'error': 'Email not found'}), 404
         
+        # Full article text lives outside the list payload, merge it in on demand
+        full_content = categorizer.load_full_content().get(email_id)
+        if full_content is not None:
+            email = {**email, 'full_content': full_content}
+        
         return jsonify({
             'success': True,
             'email': email
@@ -143,6 +231,7 @@ def get_email_details(email_id):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/stats')
+@etag_cached
 def get_stats():
     """Get email processing statistics"""
     try:
@@ -184,17 +273,18 @@ def refresh_emails():
         query = data.get('query', 'newer_than:7d')
         max_results = data.get('max_results', 30)
         
-        # Authenticate if needed
-        try:
-            categorizer.authenticate()
-        except:
-            pass  # May already be authenticated
-        
-        # Process emails
-        processed_data = categorizer.process_emails(query=query, max_results=max_results)
-        
-        # Save processed data
-        categorizer.save_processed_data(processed_data)
+        with processing_lock:
+            # Authenticate if needed
+            try:
+                categorizer.authenticate()
+            except:
+                pass  # May already be authenticated
+            
+            # Process emails
+            processed_data, full_content = categorizer.process_emails(query=query, max_results=max_results)
+            
+            # Save processed data
+            categorizer.save_processed_data(processed_data, full_content=full_content)
         
         return jsonify({
             'success': True,
@@ -214,5 +304,6 @@ if __name__ == '__main__':
     print("   POST /api/process-emails - Process new emails")
     print("   POST /api/refresh - Refresh email data")
     print("=" * 60)
+    print("💡 Development server only; for production run: gunicorn -w 4 --threads 4 --preload -b 0.0.0.0:5002 wsgi:app")
     
     app.run(debug=True, host='0.0.0.0', port=5002)
@@ -388,7 +388,7 @@ class EmailDashboard {
         if (this.currentCategory === 'all') {
             articles = this.emailsData.sections && this.emailsData.sections.articles ? this.emailsData.sections.articles : [];
         } else {
-            articles = this.emailsData.article_categories && this.emailsData.article_categories[this.currentCategory] ? this.emailsData.article_categories[this.currentCategory] : [];
+            articles = this.getCategoryArticles(this.currentCategory);
         }
         
         const articlesContainer = document.getElementById('articlesList');
@@ -409,6 +409,17 @@ class EmailDashboard {
         });
     }
     
+    getCategoryArticles(category) {
+        // Categories list article IDs; resolve them against the articles section
+        const entries = this.emailsData.article_categories && this.emailsData.article_categories[category] ? this.emailsData.article_categories[category] : [];
+        const articles = this.emailsData.sections && this.emailsData.sections.articles ? this.emailsData.sections.articles : [];
+        const articlesById = new Map(articles.map(article => [article.id, article]));
+        
+        return entries
+            .map(entry => typeof entry === 'object' ? entry : articlesById.get(entry))
+            .filter(Boolean);
+    }
+    
     createArticleCard(article) {
         const card = document.createElement('div');
         card.className = 'article-card';
@@ -449,19 +460,47 @@ class EmailDashboard {
         document.getElementById('modalCategory').textContent = this.formatCategoryName(article.category);
         document.getElementById('modalCategory').className = `article-category ${article.category}`;
         
+        this.openArticleId = article.id;
+        this.renderArticleContent(article.full_content || article.summary);
+        
+        document.getElementById('articleModal').classList.add('active');
+        document.body.style.overflow = 'hidden';
+        
+        // Full content is not part of the list payload, so fetch it on demand
+        if (!article.full_content) {
+            this.loadArticleContent(article);
+        }
+    }
+    
+    async loadArticleContent(article) {
+        try {
+            const response = await fetch(`${this.apiBase}/email/${encodeURIComponent(article.id)}`);
+            const result = await response.json();
+            
+            if (result.success && result.email.full_content) {
+                article.full_content = result.email.full_content;
+                
+                // Only update the modal if it still shows this article
+                if (this.openArticleId === article.id) {
+                    this.renderArticleContent(article.full_content);
+                }
+            }
+        } catch (error) {
+            console.error('Error loading article content:', error);
+        }
+    }
+    
+    renderArticleContent(content) {
         // Format content with paragraphs
-        const content = article.full_content || article.summary;
-        const formattedContent = content.split('\n').map(paragraph => 
+        const formattedContent = (content || '').split('\n').map(paragraph => 
             paragraph.trim() ? `<p>${this.escapeHtml(paragraph.trim())}</p>` : ''
         ).join('');
         
         document.getElementById('modalContent').innerHTML = formattedContent || '<p>No content available.</p>';
-        
-        document.getElementById('articleModal').classList.add('active');
-        document.body.style.overflow = 'hidden';
     }
     
     closeModal() {
+        this.openArticleId = null;
         document.getElementById('articleModal').classList.remove('active');
         document.body.style.overflow = '';
     }
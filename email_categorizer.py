@@ -6,37 +6,89 @@ This system categorizes emails by type and topic, then generates summaries for n
 
 import re
 import os
-import json
+import html
 import base64
+import threading
 from datetime import datetime
-from typing import List, Dict, Any, Tuple
-from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
 
-import nltk
-import pandas as pd
-from textblob import TextBlob
-from bs4 import BeautifulSoup
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
-from sklearn.metrics.pairwise import cosine_similarity
+try:
+    import fcntl
+except ImportError:  # Windows: data files are then only guarded within one process
+    fcntl = None
 
-from gmail_reader import GmailReader
+import ahocorasick
+import msgpack
+import orjson
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+from gmail_reader import GmailReader, ParsedMessage
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+# NLTK, BeautifulSoup and scikit-learn are imported on first use so that
+# read-only API endpoints never pay their import time and memory.
+
+@lru_cache(maxsize=None)
+def _sentence_tokenizer():
+    """
+    Shared sentence splitter, built once on first use
+    
+    Returns None if the Punkt model is unavailable (e.g. offline and not yet
+    downloaded); the result is cached either way so the download is only
+    attempted once per process.
+    """
+    import nltk
+    try:
+        # NLTK >= 3.9 ships the trained Punkt models as punkt_tab
+        from nltk.tokenize import PunktTokenizer
+    except ImportError:
+        PunktTokenizer = None
+    
+    # Download required NLTK data
+    resource, package = (('tokenizers/punkt_tab/english/', 'punkt_tab') if PunktTokenizer
+                         else ('tokenizers/punkt/english.pickle', 'punkt'))
+    try:
+        nltk.data.find(resource)
+    except LookupError:
+        nltk.download(package)
+    
+    # Use the trained English model; an untrained PunktSentenceTokenizer splits on every abbreviation
+    try:
+        if PunktTokenizer:
+            return PunktTokenizer('english')
+        return nltk.data.load('tokenizers/punkt/english.pickle')
+    except LookupError:
+        return None
+
+# Word tokens used for single-word keyword matching
+_WORD_RE = re.compile(r'\w+')
+
+# Regex HTML stripping used as the fast path of extract_clean_text
+_HIDDEN_RE = re.compile(r'<!--.*?-->|<(script|style)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+# Only tag-like spans count: '<' must be followed by a name, '/', '!' or '?', so comparisons
+# such as 'a < b and c > d' in plain-text bodies are left alone
+_TAG_RE = re.compile(r'<[A-Za-z/!?][^<>]*>')
+_WS_RE = re.compile(r'\s+')
+
+# Fall back to a full HTML parse when the fast path keeps less than this share of the input
+_MIN_TEXT_RATIO = 0.05
+
+# Worker threads used to clean and categorize emails
+PROCESSING_WORKERS = 8
+
+# Texts shorter than this are not worth summarizing and are returned (truncated) as-is
+SUMMARY_MIN_CHARS = 400
 
 class EmailCategorizer:
     def __init__(self):
         self.gmail = GmailReader()
         
+        # Parsed processed-data files keyed by filename -> ((mtime_ns, size), data)
+        self._cache = {}
+        self._cache_lock = threading.Lock()
+        
         # Predefined categories and keywords
         self.categories = {
             'technology': [
@@ -76,179 +128,316 @@ class EmailCategorizer:
             'unsubscribe', 'medium.com', 'substack', 'blog', 'article'
         ]
         
+        # Email type indicators, in priority order
+        self.email_type_indicators = {
+            # Job alerts and career-related emails
+            'jobs': [
+                'job alert', 'job opportunity', 'career', 'hiring', 'position available',
+                'linkedin job', 'indeed', 'glassdoor', 'naukri', 'monster.com',
+                'recruitment', 'vacancy', 'apply now', 'job match'
+            ],
+            # Promotional emails and marketing
+            'promotions': [
+                'sale', 'discount', 'offer', 'deal', 'coupon', 'promo', 'limited time',
+                'buy now', 'shop now', 'free shipping', 'save money', 'special offer'
+            ],
+            # System notifications and alerts
+            'notifications': [
+                'notification', 'alert', 'reminder', 'security', 'password',
+                'account', 'verification', 'confirm', 'activate', 'update required'
+            ],
+            # Articles, blogs, and newsletters (content-focused)
+            'articles': [
+                'newsletter', 'digest', 'weekly', 'daily update', 'blog',
+                'article', 'read more', 'latest news', 'insights', 'analysis',
+                'medium.com', 'substack', 'the-ken.com', 'economic times',
+                'techcrunch', 'hacker news', 'ycombinator'
+            ]
+        }
+        
+        # Sender domains that mark an email as an article
+        self.article_domains = [
+            'medium.com', 'substack.com', 'the-ken.com', 'techcrunch.com',
+            'hbr.org', 'mit.edu', 'stanford.edu', 'newsletter', 'digest'
+        ]
+        
+        # Single-word topic keywords are matched against the text's token set and
+        # multi-word phrases with an automaton, so each email is scanned only once
+        self._topic_word_sets = {
+            category: frozenset(k for k in keywords if _WORD_RE.fullmatch(k))
+            for category, keywords in self.categories.items()
+        }
+        self._topic_automaton = self._build_automaton({
+            category: [k for k in keywords if not _WORD_RE.fullmatch(k)]
+            for category, keywords in self.categories.items()
+        })
+        self._type_automaton = self._build_automaton(self.email_type_indicators)
+        
+    @staticmethod
+    def _build_automaton(groups: Dict[str, List[str]]) -> ahocorasick.Automaton:
+        """Build an Aho-Corasick automaton mapping each keyword to (keyword, groups it belongs to)"""
+        keyword_groups = defaultdict(list)
+        for group, keywords in groups.items():
+            for keyword in keywords:
+                keyword_groups[keyword].append(group)
+        
+        automaton = ahocorasick.Automaton()
+        for keyword, members in keyword_groups.items():
+            automaton.add_word(keyword, (keyword, tuple(members)))
+        automaton.make_automaton()
+        return automaton
+    
     def authenticate(self):
         """Authenticate with Gmail API"""
         self.gmail.authenticate()
     
-    def categorize_email_type(self, email_data: Dict) -> str:
+    @staticmethod
+    def lowercase_context(email_data: ParsedMessage) -> Dict[str, str]:
+        """Lowercase the subject, sender and body of an email once for reuse across classifiers"""
+        sender_l = email_data.sender.lower()
+        return {
+            'sender_l': sender_l,
+            'body_l': email_data.body.lower(),
+            'header_l': f"{email_data.subject.lower()} {sender_l}"
+        }
+    
+    def _match_email_type(self, text_lower: str) -> Optional[str]:
+        """Return the highest-priority email type whose indicators occur in the text, or None"""
+        # Collect every indicator group hit in one scan, stopping early on the top priority
+        priority = list(self.email_type_indicators)
+        matched = set()
+        for _, (_, email_types) in self._type_automaton.iter(text_lower):
+            if priority[0] in email_types:
+                return priority[0]
+            matched.update(email_types)
+        
+        for email_type in priority:
+            if email_type in matched:
+                return email_type
+        return None
+    
+    def categorize_email_type(self, email_data: ParsedMessage, ctx: Dict[str, str] = None) -> str:
         """Categorize email into main types: articles, jobs, notifications, promotions, personal"""
-        subject = email_data['subject'].lower()
-        sender = email_data['sender'].lower()
-        body = email_data['body'].lower()
-        text_to_check = f"{subject} {sender} {body}"
-        
-        # Job alerts and career-related emails
-        job_indicators = [
-            'job alert', 'job opportunity', 'career', 'hiring', 'position available',
-            'linkedin job', 'indeed', 'glassdoor', 'naukri', 'monster.com',
-            'recruitment', 'vacancy', 'apply now', 'job match'
-        ]
-        
-        for indicator in job_indicators:
-            if indicator in text_to_check:
-                return 'jobs'
-        
-        # Promotional emails and marketing
-        promo_indicators = [
-            'sale', 'discount', 'offer', 'deal', 'coupon', 'promo', 'limited time',
-            'buy now', 'shop now', 'free shipping', 'save money', 'special offer'
-        ]
-        
-        for indicator in promo_indicators:
-            if indicator in text_to_check:
-                return 'promotions'
-        
-        # System notifications and alerts
-        notification_indicators = [
-            'notification', 'alert', 'reminder', 'security', 'password',
-            'account', 'verification', 'confirm', 'activate', 'update required'
-        ]
+        if ctx is None:
+            ctx = self.lowercase_context(email_data)
         
-        for indicator in notification_indicators:
-            if indicator in text_to_check:
-                return 'notifications'
-        
-        # Articles, blogs, and newsletters (content-focused)
-        article_indicators = [
-            'newsletter', 'digest', 'weekly', 'daily update', 'blog',
-            'article', 'read more', 'latest news', 'insights', 'analysis',
-            'medium.com', 'substack', 'the-ken.com', 'economic times',
-            'techcrunch', 'hacker news', 'ycombinator'
-        ]
-        
-        article_domains = [
-            'medium.com', 'substack.com', 'the-ken.com', 'techcrunch.com',
-            'hbr.org', 'mit.edu', 'stanford.edu', 'newsletter', 'digest'
-        ]
-        
-        # Check for article indicators
-        for indicator in article_indicators:
-            if indicator in text_to_check:
-                return 'articles'
+        # Subject and sender usually decide the type, so only scan the (much larger) body without a hit
+        email_type = self._match_email_type(ctx['header_l'])
+        if email_type:
+            return email_type
         
         # Check sender domains for articles
-        for domain in article_domains:
-            if domain in sender:
+        for domain in self.article_domains:
+            if domain in ctx['sender_l']:
                 return 'articles'
         
+        email_type = self._match_email_type(ctx['body_l'])
+        if email_type:
+            return email_type
+        
         # Default to personal for everything else
         return 'personal'
     
-    def is_newsletter_or_blog(self, email_data: Dict) -> bool:
+    def is_newsletter_or_blog(self, email_data: ParsedMessage, ctx: Dict[str, str] = None) -> bool:
         """Determine if an email is a newsletter or blog post (for backward compatibility)"""
-        return self.categorize_email_type(email_data) == 'articles'
+        return self.categorize_email_type(email_data, ctx) == 'articles'
     
     def extract_clean_text(self, html_content: str) -> str:
         """Extract clean text from HTML content"""
         if not html_content:
             return ""
         
+        # Most bodies are text/plain, with no markup to strip
+        if '<' not in html_content:
+            return _WS_RE.sub(' ', html.unescape(html_content)).strip()
+        
+        # Fast path: strip comments, scripts, styles and tags with compiled regexes
+        text = _TAG_RE.sub(' ', _HIDDEN_RE.sub(' ', html_content))
+        text = _WS_RE.sub(' ', html.unescape(text)).strip()
+        if len(text) >= len(html_content) * _MIN_TEXT_RATIO:
+            return text
+        
+        # Unusual markup (almost no text survived), so parse it properly
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            from bs4 import BeautifulSoup
+            
+            soup = BeautifulSoup(html_content, 'lxml')
             
             # Remove script and style elements
             for script in soup(["script", "style"]):
                 script.decompose()
             
-            # Get text and clean it
-            text = soup.get_text()
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = ' '.join(chunk for chunk in chunks if chunk)
-            
-            return text
+            # Get text and collapse whitespace runs left inside text nodes
+            text = soup.get_text(separator=' ', strip=True)
+            return ' '.join(text.split())
         except Exception:
             return html_content
     
     def categorize_by_topic(self, text: str) -> str:
         """Categorize email by topic based on keywords"""
         text_lower = text.lower()
-        scores = {}
         
-        for category, keywords in self.categories.items():
-            score = sum(1 for keyword in keywords if keyword in text_lower)
-            if score > 0:
-                scores[category] = score
+        # Score each category by the number of distinct keywords found in the text
+        scores = Counter()
+        tokens = set(_WORD_RE.findall(text_lower))
+        for category, words in self._topic_word_sets.items():
+            hits = len(tokens & words)
+            if hits:
+                scores[category] = hits
+        
+        found_phrases = {match for _, match in self._topic_automaton.iter(text_lower)}
+        for _, categories in found_phrases:
+            scores.update(categories)
         
         if scores:
-            return max(scores, key=scores.get)
+            # Ties resolve to the first category in definition order
+            return max(self.categories, key=lambda category: scores[category])
         return 'general'
     
-    def generate_summary(self, text: str, max_sentences: int = 3) -> str:
+    def generate_summary(self, text: str, max_sentences: int = 3, already_clean: bool = False) -> str:
         """Generate extractive summary of the text"""
-        if not text or len(text.strip()) < 100:
-            return text[:200] + "..." if len(text) > 200 else text
+        return self.summarize_batch([text], max_sentences=max_sentences, already_clean=already_clean)[0]
+    
+    def summarize_batch(self, texts: List[str], max_sentences: int = 3,
+                        already_clean: bool = False) -> List[str]:
+        """Generate extractive summaries for several texts with a single TF-IDF fit
         
-        try:
-            # Clean text
-            clean_text = self.extract_clean_text(text)
-            if len(clean_text) < 100:
-                return clean_text
-            
-            # Split into sentences
-            blob = TextBlob(clean_text)
-            sentences = [str(sentence) for sentence in blob.sentences]
-            
-            if len(sentences) <= max_sentences:
-                return ' '.join(sentences)
-            
-            # Use TF-IDF to find most important sentences
-            vectorizer = TfidfVectorizer(stop_words='english', max_features=100)
+        Pass already_clean=True for output of extract_clean_text to skip re-cleaning.
+        """
+        summaries = [None] * len(texts)
+        
+        # Sentences of every text that needs scoring, with (index, start, end) row spans per text
+        all_sentences = []
+        spans = []
+        
+        # Resolved on the first text long enough to need splitting, then reused for the batch
+        tokenizer = None
+        tokenizer_loaded = False
+        
+        for idx, text in enumerate(texts):
+            text = text or ""
             
             try:
-                tfidf_matrix = vectorizer.fit_transform(sentences)
-                sentence_scores = tfidf_matrix.sum(axis=1).A1
+                # Clean text
+                clean_text = text if already_clean else self.extract_clean_text(text)
                 
-                # Get top sentences
-                top_indices = sentence_scores.argsort()[-max_sentences:][::-1]
-                top_indices.sort()  # Maintain original order
+                # Short texts are used as-is, skipping sentence splitting and TF-IDF scoring
+                if len(clean_text) < SUMMARY_MIN_CHARS:
+                    summaries[idx] = clean_text[:300] + "..." if len(clean_text) > 300 else clean_text
+                    continue
                 
-                summary_sentences = [sentences[i] for i in top_indices]
-                return ' '.join(summary_sentences)
-            
+                # Split into sentences
+                if not tokenizer_loaded:
+                    tokenizer = _sentence_tokenizer()
+                    tokenizer_loaded = True
+                if tokenizer is None:
+                    raise LookupError("Punkt sentence tokenizer unavailable")
+                sentences = tokenizer.tokenize(clean_text)
             except Exception:
-                # Fallback: return first few sentences
-                return ' '.join(sentences[:max_sentences])
+                # Final fallback
+                summaries[idx] = text[:300] + "..." if len(text) > 300 else text
+                continue
+            
+            if len(sentences) <= max_sentences:
+                summaries[idx] = ' '.join(sentences)
+                continue
+            
+            spans.append((idx, len(all_sentences), len(all_sentences) + len(sentences)))
+            all_sentences.extend(sentences)
+        
+        if not spans:
+            return summaries
+        
+        from sklearn.feature_extraction.text import TfidfVectorizer
         
+        # Use TF-IDF to find most important sentences, fitting the vocabulary once for the batch
+        vectorizer = TfidfVectorizer(stop_words='english', max_features=2000)
+        
+        try:
+            tfidf_matrix = vectorizer.fit_transform(all_sentences)
+            sentence_scores = tfidf_matrix.sum(axis=1).A1
         except Exception:
-            # Final fallback
-            return text[:300] + "..." if len(text) > 300 else text
+            sentence_scores = None
+        
+        for idx, start, end in spans:
+            sentences = all_sentences[start:end]
+            
+            if sentence_scores is None:
+                # Fallback: return first few sentences
+                summaries[idx] = ' '.join(sentences[:max_sentences])
+                continue
+            
+            # Get top sentences; argpartition selects them in O(n) instead of sorting every score
+            top_indices = sentence_scores[start:end].argpartition(-max_sentences)[-max_sentences:]
+            top_indices.sort()  # Maintain original order
+            
+            summaries[idx] = ' '.join(sentences[i] for i in top_indices)
+        
+        return summaries
     
-    def extract_article_info(self, email_data: Dict) -> Dict:
-        """Extract article information from newsletter/blog email"""
-        full_text = f"{email_data['subject']} {email_data['body']}"
+    def extract_article_info(self, email_data: ParsedMessage, summarize: bool = True) -> Dict:
+        """Extract article information from newsletter/blog email
+        
+        Pass summarize=False to leave 'summary' empty when the caller summarizes
+        several articles at once with summarize_batch.
+        """
+        return self._article_info_and_text(email_data, summarize)[0]
+    
+    def _article_info_and_text(self, email_data: ParsedMessage, summarize: bool = True) -> Tuple[Dict, str]:
+        """Build an article entry, returning its clean full text separately"""
+        full_text = f"{email_data.subject} {email_data.body}"
         clean_text = self.extract_clean_text(full_text)
         
+        # Full text is served on demand, so keep it out of the article entry itself
         return {
-            'id': email_data['id'],
-            'title': email_data['subject'],
-            'sender': email_data['sender'],
-            'date': email_data['date'],
+            'id': email_data.id,
+            'title': email_data.subject,
+            'sender': email_data.sender,
+            'date': email_data.date,
             'category': self.categorize_by_topic(clean_text),
-            'summary': self.generate_summary(clean_text),
-            'full_content': clean_text,
-            'snippet': email_data['snippet'],
-            'thread_id': email_data['thread_id']
-        }
+            'summary': self.generate_summary(clean_text, already_clean=True) if summarize else '',
+            'snippet': email_data.snippet,
+            'thread_id': email_data.thread_id
+        }, clean_text
+    
+    def _process_one_email(self, email_data: ParsedMessage) -> Tuple[str, Dict, Optional[str]]:
+        """Categorize a single email, building its section entry and, for articles, its full text"""
+        # Categorize email type, lowercasing the email's text only once
+        ctx = self.lowercase_context(email_data)
+        email_type = self.categorize_email_type(email_data, ctx)
+        
+        if email_type == 'articles':
+            # For articles, extract full article info with topic categorization
+            return (email_type, *self._article_info_and_text(email_data, summarize=False))
+        
+        # For other types, create simplified info
+        return email_type, {
+            'id': email_data.id,
+            'title': email_data.subject,
+            'sender': email_data.sender,
+            'date': email_data.date,
+            'snippet': email_data.snippet,
+            'thread_id': email_data.thread_id,
+            'type': email_type
+        }, None
     
-    def process_emails(self, query: str = '', max_results: int = 50) -> Dict:
-        """Process emails and categorize them into sections"""
+    def process_emails(self, query: str = '', max_results: int = 50) -> Tuple[Dict, Dict[str, str]]:
+        """
+        Process emails and categorize them into sections
+        
+        Returns the processed data and, separately, the full article text by
+        email ID; pass both to save_processed_data.
+        """
         print(f"🔍 Fetching emails with query: '{query}'")
         
-        # Get messages from Gmail
-        messages = self.gmail.get_messages(query=query, max_results=max_results)
+        # Details are fetched a batch at a time as IDs are listed, and the pool starts
+        # cleaning and categorizing each email while later batches are still downloading;
+        # categorizing needs the body, so request full messages
+        email_datas = self.gmail.iter_message_details(query, max_results, fetch_mode='full')
+        with ThreadPoolExecutor(max_workers=PROCESSING_WORKERS) as executor:
+            results = list(executor.map(self._process_one_email, email_datas))
         
-        if not messages:
+        if not results:
             return {
                 'sections': {
                     'articles': [],
@@ -259,9 +448,9 @@ class EmailCategorizer:
                 },
                 'article_categories': {},
                 'stats': {}
-            }
+            }, {}
         
-        print(f"📧 Processing {len(messages)} emails...")
+        print(f"📧 Processing {len(results)} emails...")
         
         # Initialize sections
         sections = {
@@ -273,35 +462,22 @@ class EmailCategorizer:
         }
         
         article_categories = defaultdict(list)
+        full_content = {}
         
-        for i, message in enumerate(messages):
-            print(f"Processing email {i+1}/{len(messages)}")
-            
-            # Get detailed message information
-            email_data = self.gmail.get_message_details(message['id'])
-            if not email_data:
-                continue
-            
-            # Categorize email type
-            email_type = self.categorize_email_type(email_data)
-            
+        for email_type, email_info, clean_text in results:
+            sections[email_type].append(email_info)
             if email_type == 'articles':
-                # For articles, extract full article info with topic categorization
-                article_info = self.extract_article_info(email_data)
-                sections['articles'].append(article_info)
-                article_categories[article_info['category']].append(article_info)
-            else:
-                # For other types, create simplified info
-                email_info = {
-                    'id': email_data['id'],
-                    'title': email_data['subject'],
-                    'sender': email_data['sender'],
-                    'date': email_data['date'],
-                    'snippet': email_data['snippet'],
-                    'thread_id': email_data['thread_id'],
-                    'type': email_type
-                }
-                sections[email_type].append(email_info)
+                full_content[email_info['id']] = clean_text
+                # Categories reference articles by ID so each article is stored only once
+                article_categories[email_info['category']].append(email_info['id'])
+        
+        # Summarize all articles together so the TF-IDF vectorizer is fitted only once
+        articles = sections['articles']
+        summaries = self.summarize_batch(
+            [full_content[article['id']] for article in articles], already_clean=True
+        )
+        for article, summary in zip(articles, summaries):
+            article['summary'] = summary
         
         # Calculate stats
         total_by_section = {section: len(emails) for section, emails in sections.items()}
@@ -315,30 +491,162 @@ class EmailCategorizer:
             'sections': sections,
             'article_categories': dict(article_categories),
             'stats': {
-                'total_emails': len(messages),
+                'total_emails': len(results),
                 'by_section': total_by_section,
                 'article_categories_found': list(article_categories.keys())
             }
-        }
+        }, full_content
+    
+    @staticmethod
+    def articles_in_category(processed_data: Dict, category: str) -> List[Dict]:
+        """Resolve the article IDs listed under a topic category to the article entries"""
+        articles = processed_data.get('sections', {}).get('articles', [])
+        articles_by_id = {article['id']: article for article in articles}
+        
+        resolved = []
+        for entry in processed_data.get('article_categories', {}).get(category, []):
+            # Files written before categories held IDs store the article itself
+            if isinstance(entry, dict):
+                resolved.append(entry)
+            elif entry in articles_by_id:
+                resolved.append(articles_by_id[entry])
+        return resolved
+    
+    @staticmethod
+    def full_content_filename(filename: str) -> str:
+        """Name of the file holding full article text alongside a processed data file"""
+        root, ext = os.path.splitext(filename)
+        return f"{root}_full{ext}"
+    
+    @staticmethod
+    def binary_filename(filename: str) -> str:
+        """Name of the msgpack copy of a processed data file"""
+        return f"{os.path.splitext(filename)[0]}.msgpack"
     
-    def save_processed_data(self, data: Dict, filename: str = 'processed_emails.json'):
-        """Save processed email data to JSON file"""
+    def data_etag(self, filename: str = 'processed_emails.json') -> Optional[str]:
+        """Version tag of a processed data file and its companion files, None if none exist"""
+        parts = []
+        for path in (filename, self.binary_filename(filename), self.full_content_filename(filename)):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            parts.append(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+        return '-'.join(parts) or None
+    
+    def save_processed_data(self, data: Dict, filename: str = 'processed_emails.json',
+                            full_content: Optional[Dict[str, str]] = None):
+        """
+        Save processed email data to JSON and msgpack files
+        
+        full_content, the article text by ID returned by process_emails, goes
+        to a separate file. When it is None that file is left as it is.
+        """
+        outputs = [(filename, data)]
+        if full_content is not None:
+            outputs.append((self.full_content_filename(filename), full_content))
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+            # Gunicorn workers save independently; keep each one's set of files together
+            with self._files_lock(filename, exclusive=True):
+                for path, content in outputs:
+                    self._write_atomic(path, orjson.dumps(
+                        content,
+                        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+                        default=str
+                    ))
+                self.save_processed_data_binary(data, self.binary_filename(filename))
             print(f"💾 Saved processed data to {filename}")
         except Exception as e:
             print(f"❌ Error saving data: {e}")
     
+    def save_processed_data_binary(self, data: Dict, filename: str = 'processed_emails.msgpack'):
+        """Save processed email data as msgpack, the compact copy load_processed_data reads first"""
+        self._write_atomic(filename, msgpack.packb(data, use_bin_type=True, default=str))
+    
+    @staticmethod
+    @contextmanager
+    def _files_lock(filename: str, exclusive: bool):
+        """
+        Cross-process lock on a processed data file and its companions
+        
+        Saves hold it exclusively and loads shared, so a reader in one worker
+        never pairs files from two different workers' saves.
+        """
+        if fcntl is None:
+            yield
+            return
+        try:
+            lock_file = open(f"{filename}.lock", 'a')
+        except OSError:
+            # Readers must not need write access to the data directory; only saves require the lock
+            if exclusive:
+                raise
+            yield
+            return
+        with lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    
+    @staticmethod
+    def _write_atomic(filename: str, content: bytes):
+        """Write a file via a temporary file and rename, so concurrent readers never see it half-written"""
+        tmp_filename = f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_filename, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_filename, filename)
+    
+    def _load_cached(self, filename: str, loads=orjson.loads):
+        """Load a data file, re-parsing it only when it has changed since the last load"""
+        if not os.path.exists(filename):
+            return None
+        
+        stat = os.stat(filename)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._cache.get(filename)
+        if cached and cached[0] == signature:
+            return cached[1]
+        
+        # Serialize misses so concurrent requests parse a changed file only once
+        with self._cache_lock:
+            cached = self._cache.get(filename)
+            if cached and cached[0] == signature:
+                return cached[1]
+            
+            with open(filename, 'rb') as f:
+                data = loads(f.read())
+            self._cache[filename] = (signature, data)
+            return data
+    
     def load_processed_data(self, filename: str = 'processed_emails.json') -> Dict:
-        """Load processed email data from JSON file"""
+        """Load processed email data, preferring the msgpack copy unless the JSON file is newer"""
         try:
-            if os.path.exists(filename):
-                with open(filename, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            binary_filename = self.binary_filename(filename)
+            with self._files_lock(filename, exclusive=False):
+                if os.path.exists(binary_filename) and (
+                        not os.path.exists(filename)
+                        or os.stat(binary_filename).st_mtime_ns >= os.stat(filename).st_mtime_ns):
+                    data = self._load_cached(binary_filename, loads=msgpack.unpackb)
+                else:
+                    data = self._load_cached(filename)
+            if data is not None:
+                return data
         except Exception as e:
             print(f"❌ Error loading data: {e}")
         return {'newsletters': [], 'regular_emails': [], 'categories': {}}
+    
+    def load_full_content(self, filename: str = 'processed_emails.json') -> Dict[str, str]:
+        """Load full article text by email ID for a processed data file"""
+        try:
+            with self._files_lock(filename, exclusive=False):
+                data = self._load_cached(self.full_content_filename(filename))
+            if data is not None:
+                return data
+        except Exception as e:
+            print(f"❌ Error loading full content: {e}")
+        return {}
 
 def main():
     """Main function to demonstrate email categorization"""
@@ -353,10 +661,10 @@ def main():
         
         # Process recent emails
         print("\n📥 Processing recent emails...")
-        processed_data = categorizer.process_emails(query='newer_than:7d', max_results=30)
+        processed_data, full_content = categorizer.process_emails(query='newer_than:7d', max_results=30)
         
         # Save processed data
-        categorizer.save_processed_data(processed_data)
+        categorizer.save_processed_data(processed_data, full_content=full_content)
         
         # Display results
         stats = processed_data['stats']
@@ -5,30 +5,331 @@ This script connects to Gmail API and reads emails from your account.
 """
 
 import os
+import sys
 import json
-import base64
+import logging
+import time
+import binascii
+import random
+import asyncio
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
 from datetime import datetime
+from email.utils import parsedate_to_datetime
+from functools import lru_cache, wraps
+from typing import Literal, Optional
+from itertools import islice
+
+import aiohttp
+import google_auth_httplib2
+import httplib2
+import orjson
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
+
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
 
 # Gmail API scope - modify as needed
 SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 
+# Maximum number of calls Gmail accepts in a single batch request
+BATCH_SIZE = 100
+
+# Largest page Gmail returns from messages.list
+MAX_PAGE_SIZE = 500
+
+# Socket timeout in seconds for the shared Gmail HTTP connection
+HTTP_TIMEOUT = 30
+
+# Gmail REST endpoint used by the asyncio fetch path
+GMAIL_API_URL = 'https://gmail.googleapis.com/gmail/v1/users/me'
+
+# Maximum in-flight requests on the asyncio fetch path, to stay within Gmail's per-user quota
+ASYNC_CONCURRENCY = 10
+
+# Rate-limit and server errors worth retrying, the attempts made before giving up,
+# and the longest wait in seconds between attempts (including server-sent Retry-After)
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+MAX_ATTEMPTS = 6
+MAX_BACKOFF = 32
+
+# Gmail message formats GmailReader can request: headers and snippet only, or the full payload
+FetchMode = Literal['metadata', 'full']
+METADATA_HEADERS = ['Subject', 'From', 'Date']
+
+# Partial response: only the message fields parse_message reads, with MIME parts
+# nested three levels deep (e.g. text/plain inside multipart/alternative inside multipart/mixed)
+_PART_FIELDS = 'mimeType,body/data'
+MESSAGE_FIELDS = ('id,threadId,snippet,internalDate,'
+                  f'payload({_PART_FIELDS},headers(name,value),'
+                  f'parts({_PART_FIELDS},parts({_PART_FIELDS},parts({_PART_FIELDS}))))')
+
+class OrjsonModel(JsonModel):
+    """JsonModel that decodes Gmail API responses with orjson instead of the stdlib json module"""
+    
+    def deserialize(self, content):
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # Like JsonModel, hand back non-JSON content as text rather than raising
+            return content.decode('utf-8') if isinstance(content, bytes) else content
+        if self._data_wrapper and 'data' in body:
+            body = body['data']
+        return body
+
+def _backoff_delay(attempt, retry_after=None):
+    """Seconds to wait before retry number attempt: Retry-After if given, else jittered exponential backoff"""
+    if retry_after:
+        try:
+            return max(0.0, min(MAX_BACKOFF, float(retry_after)))
+        except ValueError:
+            pass
+    return min(MAX_BACKOFF, 2 ** attempt + random.random())
+
+def _is_retryable(error):
+    """Whether a googleapiclient error is a rate-limit or transient server error"""
+    return isinstance(error, HttpError) and error.resp.status in RETRYABLE_STATUSES
+
+def _retrying(func):
+    """Retry func on 429/5xx HttpErrors with exponential backoff, re-raising after MAX_ATTEMPTS"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                return func(*args, **kwargs)
+            except HttpError as error:
+                if not _is_retryable(error) or attempt == MAX_ATTEMPTS - 1:
+                    raise
+                time.sleep(_backoff_delay(attempt, error.resp.get('retry-after')))
+    return wrapper
+
+@_retrying
+def _execute(request):
+    """Execute a single googleapiclient request, retrying rate-limit and server errors"""
+    return request.execute()
+
+def _chunked(iterable, size):
+    """Yield successive lists of up to size items from iterable"""
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+@lru_cache(maxsize=4096)
+def _parse_email_time(date):
+    """Parse an RFC 2822 Date header, memoized as messages in a thread often share dates"""
+    try:
+        return parsedate_to_datetime(date)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+# Maps the base64url alphabet onto standard base64 so binascii can decode it directly
+_B64_TRANS = bytes.maketrans(b'-_', b'+/')
+
+def _decode_body(data):
+    """Decode a base64url-encoded Gmail body to text, restoring any stripped padding"""
+    raw = data.encode('ascii').translate(_B64_TRANS)
+    return binascii.a2b_base64(raw + b'=' * (-len(raw) % 4)).decode('utf-8', 'replace')
+
+@dataclass(slots=True)
+class ParsedMessage:
+    """
+    Fields of a Gmail message used by the reader and the categorizer
+    
+    The text/plain body is kept base64url-encoded and only decoded the
+    first time body is read.
+    """
+    id: str
+    thread_id: str
+    subject: str
+    sender: str
+    date: str
+    body_b64: Optional[str]
+    snippet: str
+    _body: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def body(self):
+        """Decoded text/plain body, or an empty string if the message has none"""
+        if self._body is None:
+            self._body = _decode_body(self.body_b64) if self.body_b64 else ""
+        return self._body
+    
+    @property
+    def date_parsed(self):
+        """Date header as a datetime, or None if it cannot be parsed"""
+        return _parse_email_time(self.date)
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a message from to_dict() output, also accepting an already decoded 'body'"""
+        message = cls(data['id'], data['thread_id'], data['subject'], data['sender'],
+                      data['date'], data.get('body_b64'), data['snippet'])
+        if 'body' in data:
+            message._body = data['body']
+        return message
+    
+    def copy(self):
+        """Shallow copy that keeps an already decoded body (dataclasses.replace would drop it)"""
+        message = replace(self)
+        message._body = self._body
+        return message
+    
+    def to_dict(self):
+        """Plain dict of the message fields, for JSON serialization"""
+        return {
+            'id': self.id,
+            'thread_id': self.thread_id,
+            'subject': self.subject,
+            'sender': self.sender,
+            'date': self.date,
+            'body_b64': self.body_b64,
+            'snippet': self.snippet
+        }
+
+# Persistent parsed-message cache, the number of messages it keeps on disk, and the
+# smaller number also kept in memory (full messages carry their whole body)
+CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'zynk', 'messages.sqlite')
+MAX_CACHE_SIZE = 4096
+MAX_MEMORY_CACHE_SIZE = 256
+
+class MessageCache:
+    """
+    Cache of parsed messages keyed by (message ID, format)
+    
+    Delivered Gmail messages never change, so parsed results are stored in
+    sqlite and reused across runs. Only the MAX_CACHE_SIZE most recent
+    messages (by internal date) are kept on disk; the MAX_MEMORY_CACHE_SIZE
+    most recently used are also kept in memory, evicted in insertion order.
+    
+    The cache directory and sqlite connection are created on first use in
+    each process, so constructing a cache is free and a connection is never
+    shared across fork() (e.g. gunicorn --preload).
+    """
+    
+    def __init__(self, path=CACHE_FILE, max_size=MAX_CACHE_SIZE, memory_size=MAX_MEMORY_CACHE_SIZE):
+        self._path = path
+        self._db = None
+        self._db_pid = None
+        self._memory = OrderedDict()
+        self._max_size = max_size
+        self._memory_size = memory_size
+        self._lock = threading.Lock()
+    
+    def _connection(self):
+        """Return this process's sqlite connection, opening it if needed (call with the lock held)"""
+        if self._db is None or self._db_pid != os.getpid():
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self._path, check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS messages ('
+                'id TEXT NOT NULL, format TEXT NOT NULL, internal_date INTEGER, '
+                'parsed_json TEXT NOT NULL, PRIMARY KEY (id, format))')
+            db.execute('CREATE INDEX IF NOT EXISTS messages_internal_date ON messages (internal_date)')
+            db.commit()
+            self._db, self._db_pid = db, os.getpid()
+        return self._db
+    
+    def get(self, message_id, format):
+        """Return a copy of the cached parsed message, or None"""
+        key = (message_id, format)
+        with self._lock:
+            parsed = self._memory.get(key)
+            if parsed is None:
+                try:
+                    row = self._connection().execute(
+                        'SELECT parsed_json FROM messages WHERE id = ? AND format = ?', key).fetchone()
+                except (OSError, sqlite3.Error) as error:
+                    log.warning("⚠️  Message cache read failed: %s", error)
+                    return None
+                if row is None:
+                    return None
+                parsed = ParsedMessage.from_dict(json.loads(row[0]))
+                self._remember(key, parsed)
+        return parsed.copy()
+    
+    def put(self, message_id, format, internal_date, parsed):
+        """Store a parsed message, dropping the oldest messages beyond max_size"""
+        key = (message_id, format)
+        with self._lock:
+            try:
+                db = self._connection()
+                db.execute(
+                    'INSERT OR REPLACE INTO messages (id, format, internal_date, parsed_json) '
+                    'VALUES (?, ?, ?, ?)',
+                    (message_id, format, internal_date,
+                     json.dumps(parsed.to_dict())))
+                db.execute(
+                    'DELETE FROM messages WHERE rowid IN ('
+                    'SELECT rowid FROM messages ORDER BY internal_date DESC LIMIT -1 OFFSET ?)',
+                    (self._max_size,))
+                db.commit()
+            except (OSError, sqlite3.Error) as error:
+                log.warning("⚠️  Message cache write failed: %s", error)
+            self._remember(key, parsed.copy())
+    
+    def _remember(self, key, parsed):
+        self._memory[key] = parsed
+        while len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+
+def _parse_hdrs(headers):
+    """Return (subject, sender, date) from the first Subject/From/Date headers in one pass"""
+    subject = sender = date = None
+    for header in headers:
+        name = header['name']
+        if name == 'Subject':
+            if subject is None:
+                subject = header['value']
+        elif name == 'From':
+            if sender is None:
+                sender = header['value']
+        elif name == 'Date':
+            if date is None:
+                date = header['value']
+        else:
+            continue
+        # Stop scanning the remaining headers once all three have been seen
+        if subject is not None and sender is not None and date is not None:
+            break
+    return (
+        'No Subject' if subject is None else subject,
+        'Unknown Sender' if sender is None else sender,
+        'Unknown Date' if date is None else date
+    )
+
 class GmailReader:
-    def __init__(self, credentials_file='credentials.json', token_file='token.json'):
+    __slots__ = ('credentials_file', 'token_file', 'service', 'creds', 'cache', '_refresh_lock')
+    
+    def __init__(self, credentials_file='credentials.json', token_file='token.json',
+                 cache_file=CACHE_FILE):
         """
         Initialize Gmail Reader
         
         Args:
             credentials_file (str): Path to your Gmail API credentials JSON file
             token_file (str): Path to store the authentication token
+            cache_file (str): Path of the parsed-message cache, or None to disable caching
         """
         self.credentials_file = credentials_file
         self.token_file = token_file
         self.service = None
+        self.creds = None
+        self.cache = None
+        self._refresh_lock = threading.Lock()
+        
+        if cache_file:
+            self.cache = MessageCache(cache_file)
         
     def authenticate(self):
         """Authenticate with Gmail API"""
@@ -37,6 +338,7 @@ class GmailReader:
         # Check if token file exists
         if os.path.exists(self.token_file):
             creds = Credentials.from_authorized_user_file(self.token_file, SCOPES)
+        old_token = creds.token if creds else None
         
         # If there are no (valid) credentials available, let the user log in
         if not creds or not creds.valid:
@@ -50,15 +352,40 @@ class GmailReader:
                 flow = InstalledAppFlow.from_client_secrets_file(
                     self.credentials_file, SCOPES)
                 creds = flow.run_local_server(port=0)
-            
-            # Save the credentials for the next run
+        
+        # Save the credentials for the next run, only if a refresh or login produced a new token
+        if creds.token != old_token:
             with open(self.token_file, 'w') as token:
                 token.write(creds.to_json())
         
-        # Build the Gmail service
-        self.service = build('gmail', 'v1', credentials=creds)
-        print("✅ Successfully authenticated with Gmail API")
+        # Build the Gmail service on one authorized connection so TCP/TLS is reused across calls,
+        # loading the discovery document bundled with googleapiclient instead of fetching it
+        self.creds = creds
+        authed_http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+        self.service = build('gmail', 'v1', http=authed_http, model=OrjsonModel(),
+                             cache_discovery=False, static_discovery=True)
+        log.info("✅ Successfully authenticated with Gmail API")
         
+    def iter_messages(self, query='', page_size=100):
+        """
+        Iterate over messages matching query, following list pages lazily
+        
+        The next page is only requested once the current one is consumed.
+        
+        Args:
+            query (str): Gmail search query (e.g., 'is:unread', 'from:example@gmail.com')
+            page_size (int): Messages requested per list page (at most MAX_PAGE_SIZE)
+            
+        Yields:
+            dict: Message stubs with 'id' and 'threadId'
+        """
+        messages = self.service.users().messages()
+        request = messages.list(userId='me', q=query, maxResults=min(page_size, MAX_PAGE_SIZE))
+        while request is not None:
+            response = _execute(request)
+            yield from response.get('messages', [])
+            request = messages.list_next(request, response)
+    
     def get_messages(self, query='', max_results=10):
         """
         Get messages from Gmail
@@ -71,32 +398,235 @@ class GmailReader:
             list: List of message IDs
         """
         try:
-            results = self.service.users().messages().list(
-                userId='me', q=query, maxResults=max_results).execute()
-            messages = results.get('messages', [])
-            return messages
+            return list(islice(self.iter_messages(query, page_size=max_results), max_results))
         except HttpError as error:
-            print(f"An error occurred: {error}")
+            log.error("An error occurred: %s", error)
             return []
     
-    def get_message_details(self, message_id):
+    def iter_message_details(self, query='', max_results=None, fetch_mode: FetchMode = 'metadata'):
+        """
+        Iterate over parsed messages matching query, one batch request per BATCH_SIZE messages
+        
+        Each batch of details is fetched as soon as enough IDs have been listed,
+        so callers can start on the first messages before pagination finishes.
+        
+        Args:
+            query (str): Gmail search query
+            max_results (int): Maximum number of messages, or None for all matches
+            fetch_mode (str): 'metadata' for headers and snippet only, 'full' to include the body
+            
+        Yields:
+            ParsedMessage: Parsed message data
+        """
+        page_size = min(max_results, MAX_PAGE_SIZE) if max_results else MAX_PAGE_SIZE
+        stubs = islice(self.iter_messages(query, page_size), max_results)
+        try:
+            for chunk in _chunked(stubs, BATCH_SIZE):
+                yield from self.get_messages_details_batch([m['id'] for m in chunk], fetch_mode)
+        except HttpError as error:
+            # Like get_messages, a failed list request ends the results instead of raising
+            log.error("An error occurred: %s", error)
+    
+    def get_message_details(self, message_id, fetch_mode: FetchMode = 'metadata'):
         """
         Get detailed information about a specific message
         
         Args:
             message_id (str): Gmail message ID
+            fetch_mode (str): 'metadata' for headers and snippet only, 'full' to include the body
             
         Returns:
-            dict: Message details
+            ParsedMessage: Message details
         """
+        hits, _ = self._split_cached([message_id], fetch_mode)
+        if message_id in hits:
+            return hits[message_id]
+        
         try:
-            message = self.service.users().messages().get(
-                userId='me', id=message_id, format='full').execute()
-            return self.parse_message(message)
+            message = _execute(self.service.users().messages().get(
+                userId='me', id=message_id, **self._get_params(fetch_mode)))
+            if not isinstance(message, dict):
+                log.error("An error occurred: unexpected non-JSON response for message %s", message_id)
+                return None
+            return self._parse_and_cache(message, fetch_mode)
         except HttpError as error:
-            print(f"An error occurred: {error}")
+            log.error("An error occurred: %s", error)
             return None
     
+    def get_messages_details_batch(self, message_ids, fetch_mode: FetchMode = 'metadata'):
+        """
+        Get detailed information about several messages using batch requests
+        
+        Up to BATCH_SIZE messages.get calls are sent in each HTTP request.
+        Calls that fail with a rate-limit or server error are re-sent in a
+        new batch after a backoff delay, up to MAX_ATTEMPTS times. Messages
+        still failing after that are fetched with individual, concurrency
+        limited requests through get_messages_details_async.
+        
+        Args:
+            message_ids (list): Gmail message IDs
+            fetch_mode (str): 'metadata' for headers and snippet only, 'full' to include the body
+            
+        Returns:
+            list: Message details in the order of message_ids (failed messages are skipped)
+        """
+        # Batch request IDs must be unique, so fetch each message once even if it is listed twice
+        results, pending = self._split_cached(dict.fromkeys(message_ids), fetch_mode)
+        retry_ids = []
+        
+        def handle_response(request_id, response, exception):
+            if exception is not None:
+                if _is_retryable(exception):
+                    retry_ids.append(request_id)
+                else:
+                    log.error("An error occurred: %s", exception)
+                return
+            if not isinstance(response, dict):
+                log.error("An error occurred: unexpected non-JSON response for message %s", request_id)
+                return
+            results[request_id] = self._parse_and_cache(response, fetch_mode)
+        
+        # This loop is the only retry layer on the batch path: failed items and whole
+        # failed batches are both re-sent from here, so the batch is executed directly
+        for attempt in range(MAX_ATTEMPTS):
+            for start in range(0, len(pending), BATCH_SIZE):
+                chunk = pending[start:start + BATCH_SIZE]
+                batch = self.service.new_batch_http_request(callback=handle_response)
+                for message_id in chunk:
+                    batch.add(
+                        self.service.users().messages().get(
+                            userId='me', id=message_id, **self._get_params(fetch_mode)),
+                        request_id=message_id)
+                try:
+                    batch.execute()
+                except HttpError as error:
+                    if _is_retryable(error):
+                        retry_ids.extend(message_id for message_id in chunk if message_id not in results)
+                    else:
+                        log.error("An error occurred: %s", error)
+            
+            if not retry_ids or attempt == MAX_ATTEMPTS - 1:
+                break
+            pending = list(dict.fromkeys(retry_ids))
+            retry_ids.clear()
+            time.sleep(_backoff_delay(attempt))
+        
+        if retry_ids:
+            self._fetch_leftovers_async(list(dict.fromkeys(retry_ids)), fetch_mode, results)
+        
+        return [results[message_id] for message_id in message_ids if message_id in results]
+    
+    def _fetch_leftovers_async(self, message_ids, fetch_mode, results):
+        """Fetch messages that batch requests gave up on over the asyncio path, adding them to results"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            # asyncio.run cannot nest; async callers should use get_messages_details_async directly
+            log.error("An error occurred: gave up on %d rate-limited messages", len(message_ids))
+            return
+        
+        log.warning("Batch requests rate limited, fetching %d messages individually", len(message_ids))
+        fetched = asyncio.run(self.get_messages_details_async(message_ids, fetch_mode))
+        results.update((message.id, message) for message in fetched)
+        missing = len(message_ids) - len(fetched)
+        if missing:
+            log.error("An error occurred: gave up on %d rate-limited messages", missing)
+    
+    @staticmethod
+    def _get_params(fetch_mode):
+        """messages.get query parameters for a fetch mode"""
+        params = {'format': fetch_mode, 'fields': MESSAGE_FIELDS}
+        if fetch_mode == 'metadata':
+            params['metadataHeaders'] = METADATA_HEADERS
+        return params
+    
+    def _refresh_if_needed(self):
+        """Refresh expired credentials, once even if several callers notice at the same time"""
+        with self._refresh_lock:
+            if not self.creds.valid:
+                self.creds.refresh(Request())
+    
+    async def _auth_headers(self):
+        """Authorization header for direct REST calls, refreshing the token off the event loop when needed"""
+        if not self.creds.valid:
+            await asyncio.to_thread(self._refresh_if_needed)
+        return {'Authorization': f'Bearer {self.creds.token}'}
+    
+    async def _get_async(self, session, message_id, fetch_mode):
+        """Fetch and parse a single message over aiohttp"""
+        url = f"{GMAIL_API_URL}/messages/{message_id}"
+        # Repeated metadataHeaders values need a list of pairs rather than a dict
+        params = [(key, item) for key, value in self._get_params(fetch_mode).items()
+                  for item in (value if isinstance(value, list) else [value])]
+        async with session.get(url, headers=await self._auth_headers(), params=params) as response:
+            response.raise_for_status()
+            return self._parse_and_cache(orjson.loads(await response.read()), fetch_mode)
+    
+    async def _bounded(self, semaphore, session, message_id, fetch_mode):
+        """Fetch a message once a concurrency slot is free, retrying 429/5xx and returning None on failure"""
+        async with semaphore:
+            for attempt in range(MAX_ATTEMPTS):
+                try:
+                    return await self._get_async(session, message_id, fetch_mode)
+                except aiohttp.ClientResponseError as error:
+                    if error.status not in RETRYABLE_STATUSES or attempt == MAX_ATTEMPTS - 1:
+                        log.error("An error occurred: %s", error)
+                        return None
+                    retry_after = error.headers.get('Retry-After') if error.headers else None
+                    await asyncio.sleep(_backoff_delay(attempt, retry_after))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                    log.error("An error occurred fetching message %s: %r", message_id, error)
+                    return None
+    
+    async def get_messages_details_async(self, message_ids, fetch_mode: FetchMode = 'metadata'):
+        """
+        Get detailed information about several messages with concurrent requests
+        
+        At most ASYNC_CONCURRENCY requests are in flight at once.
+        get_messages_details_batch falls back to this for messages its batch
+        requests stay rate limited on.
+        
+        Args:
+            message_ids (list): Gmail message IDs
+            fetch_mode (str): 'metadata' for headers and snippet only, 'full' to include the body
+            
+        Returns:
+            list: Message details in the order of message_ids (failed messages are skipped)
+        """
+        results, misses = self._split_cached(message_ids, fetch_mode)
+        
+        semaphore = asyncio.Semaphore(ASYNC_CONCURRENCY)
+        async with aiohttp.ClientSession() as session:
+            fetched = await asyncio.gather(
+                *(self._bounded(semaphore, session, message_id, fetch_mode) for message_id in misses))
+        
+        results.update((message_id, parsed) for message_id, parsed in zip(misses, fetched) if parsed)
+        return [results[message_id] for message_id in message_ids if message_id in results]
+    
+    def _split_cached(self, message_ids, fetch_mode):
+        """Split message IDs into cached parsed messages (by ID) and IDs still to fetch"""
+        if self.cache is None:
+            return {}, list(message_ids)
+        
+        hits = {}
+        misses = []
+        for message_id in message_ids:
+            parsed = self.cache.get(message_id, fetch_mode)
+            if parsed is None:
+                misses.append(message_id)
+            else:
+                hits[message_id] = parsed
+        return hits, misses
+    
+    def _parse_and_cache(self, message, fetch_mode):
+        """Parse a raw Gmail message and store the result in the message cache"""
+        parsed = self.parse_message(message)
+        if self.cache is not None:
+            self.cache.put(message['id'], fetch_mode, int(message.get('internalDate', 0)), parsed)
+        return parsed
+    
     def parse_message(self, message):
         """
         Parse Gmail message and extract relevant information
@@ -105,71 +635,77 @@ class GmailReader:
             message (dict): Raw Gmail message
             
         Returns:
-            dict: Parsed message data
+            ParsedMessage: Parsed message data
         """
         payload = message['payload']
         headers = payload.get('headers', [])
         
         # Extract headers
-        subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-        sender = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown Sender')
-        date = next((h['value'] for h in headers if h['name'] == 'Date'), 'Unknown Date')
+        subject, sender, date = _parse_hdrs(headers)
         
-        # Extract body
-        body = self.extract_body(payload)
+        # Extract body, left encoded until it is read
+        body_b64 = self.extract_body(payload)
         
-        return {
-            'id': message['id'],
-            'thread_id': message['threadId'],
-            'subject': subject,
-            'sender': sender,
-            'date': date,
-            'body': body,
-            'snippet': message.get('snippet', '')
-        }
+        return ParsedMessage(
+            id=message['id'],
+            thread_id=message['threadId'],
+            subject=subject,
+            sender=sender,
+            date=date,
+            body_b64=body_b64,
+            snippet=message.get('snippet', '')
+        )
     
     def extract_body(self, payload):
-        """Extract email body from payload"""
-        body = ""
-        
-        if 'parts' in payload:
-            for part in payload['parts']:
-                if part['mimeType'] == 'text/plain':
-                    if 'data' in part['body']:
-                        body = base64.urlsafe_b64decode(
-                            part['body']['data']).decode('utf-8')
-                        break
-        else:
-            if payload['mimeType'] == 'text/plain':
-                if 'data' in payload['body']:
-                    body = base64.urlsafe_b64decode(
-                        payload['body']['data']).decode('utf-8')
+        """
+        Find the first text/plain body in payload, searching nested multipart parts
         
-        return body
+        Returns:
+            str: The body's base64url data as sent by Gmail, or None if there is none
+        """
+        # Depth-first walk in document order; parts are pushed reversed so the first part pops first
+        stack = [payload]
+        while stack:
+            part = stack.pop()
+            if 'parts' in part:
+                stack.extend(reversed(part['parts']))
+            elif part.get('mimeType') == 'text/plain':
+                data = part.get('body', {}).get('data')
+                if data:
+                    return data
+        
+        return None
     
     def display_messages(self, messages_data):
-        """Display messages in a formatted way"""
-        if not messages_data:
-            print("No messages found.")
+        """Log messages in a formatted way at INFO level"""
+        # Skip formatting entirely when nobody is listening
+        if not log.isEnabledFor(logging.INFO):
             return
         
-        print(f"\n📧 Found {len(messages_data)} messages:\n")
-        print("=" * 80)
+        if not messages_data:
+            log.info("No messages found.")
+            return
         
+        # Build the whole listing first and log it once instead of line by line
+        out = [f"\n📧 Found {len(messages_data)} messages:\n", "=" * 80]
         for i, msg in enumerate(messages_data, 1):
-            print(f"\n📨 Message {i}:")
-            print(f"Subject: {msg['subject']}")
-            print(f"From: {msg['sender']}")
-            print(f"Date: {msg['date']}")
-            print(f"Snippet: {msg['snippet'][:100]}...")
-            if msg['body']:
-                print(f"Body: {msg['body'][:200]}...")
-            print("-" * 80)
+            out.append(f"\n📨 Message {i}:")
+            out.append(f"Subject: {msg.subject}")
+            out.append(f"From: {msg.sender}")
+            out.append(f"Date: {msg.date}")
+            out.append(f"Snippet: {msg.snippet[:100]}...")
+            if msg.body:
+                out.append(f"Body: {msg.body[:200]}...")
+            out.append("-" * 80)
+        log.info("\n".join(out))
 
 def main():
     """Main function to demonstrate Gmail API usage"""
-    print("🚀 Gmail API Email Reader")
-    print("=" * 40)
+    # Script output goes to stdout like the prints it replaced, so it can be redirected
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
+    
+    log.info("🚀 Gmail API Email Reader")
+    log.info("=" * 40)
     
     # Initialize Gmail Reader
     gmail = GmailReader()
@@ -178,52 +714,45 @@ def main():
         # Authenticate
         gmail.authenticate()
         
-        # Get recent messages
-        print("\n📥 Fetching recent emails...")
-        messages = gmail.get_messages(query='', max_results=5)
+        # List recent and unread messages, then fetch both sets in one batched pass
+        log.info("\n📥 Fetching recent and unread emails...")
+        recent_ids = [m['id'] for m in gmail.get_messages(query='', max_results=5)]
+        unread_ids = [m['id'] for m in gmail.get_messages(query='is:unread', max_results=3)]
         
-        if not messages:
-            print("No messages found.")
+        # dict.fromkeys dedupes overlapping IDs while keeping list order
+        all_ids = list(dict.fromkeys(recent_ids + unread_ids))
+        if not all_ids:
+            log.info("No messages found.")
             return
         
-        # Get detailed information for each message
-        messages_data = []
-        for message in messages:
-            msg_details = gmail.get_message_details(message['id'])
-            if msg_details:
-                messages_data.append(msg_details)
+        messages_data = gmail.get_messages_details_batch(all_ids)
         
-        # Display messages
-        gmail.display_messages(messages_data)
-        
-        # Example: Get unread messages
-        print("\n\n📬 Fetching unread emails...")
-        unread_messages = gmail.get_messages(query='is:unread', max_results=3)
+        # Split the results back into the two groups
+        recent_set, unread_set = set(recent_ids), set(unread_ids)
+        recent_data = [msg for msg in messages_data if msg.id in recent_set]
+        unread_data = [msg for msg in messages_data if msg.id in unread_set]
         
-        unread_data = []
-        for message in unread_messages:
-            msg_details = gmail.get_message_details(message['id'])
-            if msg_details:
-                unread_data.append(msg_details)
+        # Display messages
+        gmail.display_messages(recent_data)
         
         if unread_data:
-            print(f"\n📬 Found {len(unread_data)} unread messages:")
+            log.info("\n📬 Found %d unread messages:", len(unread_data))
             gmail.display_messages(unread_data)
         else:
-            print("No unread messages found.")
+            log.info("No unread messages found.")
             
     except FileNotFoundError as e:
-        print(f"❌ Error: {e}")
-        print("\n📋 To use this script, you need to:")
-        print("1. Go to Google Cloud Console (https://console.cloud.google.com/)")
-        print("2. Create a new project or select existing one")
-        print("3. Enable Gmail API")
-        print("4. Create credentials (OAuth 2.0 Client ID)")
-        print("5. Download the credentials JSON file")
-        print("6. Rename it to 'credentials.json' and place it in this directory")
+        log.error("❌ Error: %s", e)
+        log.info("\n📋 To use this script, you need to:")
+        log.info("1. Go to Google Cloud Console (https://console.cloud.google.com/)")
+        log.info("2. Create a new project or select existing one")
+        log.info("3. Enable Gmail API")
+        log.info("4. Create credentials (OAuth 2.0 Client ID)")
+        log.info("5. Download the credentials JSON file")
+        log.info("6. Rename it to 'credentials.json' and place it in this directory")
         
     except Exception as e:
-        print(f"❌ An error occurred: {e}")
+        log.error("❌ An error occurred: %s", e)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+"""
+WSGI entry point for the Email Categorization API
+Run with: gunicorn -w 4 --threads 4 --preload -b 0.0.0.0:5002 wsgi:app
+"""
+
+from api import app
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=5002)